@@ -107,7 +107,7 @@ def GPIO_periph_advanced_cleaner(periph: "Peripheral") :
 			for field in var :
 				newField = copy(field)
 				newField.position += 32
-				newField.edited = True
+				newField.invalidate()
 				AFR.add_field(newField)
 		for m in periph.mappings :
 			if "AFRL" in m :
@@ -130,7 +130,7 @@ def SYSCFG_periph_advanced_cleaner(periph: "Peripheral") :
 				for field in var :
 					newField = copy(field)
 					newField.position += i*32
-					newField.edited = True
+					newField.invalidate()
 					EXTICR.add_field(newField)
 		for m in periph.mappings :
 			if "EXTICR1" in m :
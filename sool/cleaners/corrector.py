@@ -22,8 +22,12 @@ import typing as T
 from functools import partial
 from fnmatch import fnmatch
 
-from . import *
 from sool.structure import Component
+from .field_cleaners import *
+from .register_cleaners import *
+from .peripheral_cleaners import *
+from .group_cleaners import *
+from .advanced_correctors import *
 
 def modify(obj, name=None, type=None, brief=None, size=None) :
 	if name is not None :
@@ -205,7 +205,7 @@ def DMA_periph_cleaner(periph: "Peripheral") :
 		if len(chips_to_remove) > 0 :
 			# Remove invalid chips from the register list of chips.
 			reg.chips.remove(chips_to_remove)
-			reg.edited = True
+			reg.invalidate()
 			if reg.chips.empty :
 				# If the register is not used anymore, delete it.
 				periph.remove_register(reg)
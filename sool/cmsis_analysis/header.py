@@ -41,7 +41,7 @@ class CMSISRegister:
 
 	@property
 	def byte_offset(self):
-		return int(self.bit_offset / 8)
+		return self.bit_offset >> 3
 
 	def apply_corrector(self, parent_corrector) :
 		correctors = parent_corrector[self.name]
@@ -20,7 +20,12 @@
 import logging
 import os
 import typing as T
-import xml.etree.ElementTree as ET
+try :
+	from lxml import etree as ET
+	_has_lxml = True
+except ImportError :
+	import xml.etree.ElementTree as ET
+	_has_lxml = False
 from sool.structure.chipset import ChipSet, Chip
 from sool.structure.group import Group
 from sool.structure.peripheral import Peripheral, PeripheralInstance
@@ -58,57 +63,90 @@ class SVDFile :
 		logger.info(f"Processing SVD file {self.file_name}")
 	
 		periph_instances_dict : T.Dict[str,PeripheralInstance] = dict()
-		root = ET.parse(self.path).getroot()
-		
-		if self.chipset.empty :
-			self.chipset.add(Chip(get_node_text(root, "name"), self.file_name))
-		
-		for svd_periph in root.findall("peripherals/peripheral"):
-			#periph : Peripheral = None
-			group_name : str =  get_node_text(svd_periph, "groupName").upper()
-			if "derivedFrom" not in svd_periph.attrib:  # new peripheral
-				# return the group associated with the name, and creates it if necessary
-				if filter_grp_name is not None and len(filter_grp_name) > 0 and group_name not in filter_grp_name :
-					continue
-		
-				group = Group.get_group(self.groups, group_name)
-		
-				# create the peripheral, add it to the group
-				periph = Peripheral.create_from_xml(self.chipset, svd_periph)
-				group.add_peripheral(periph)
-		
-			else:  # peripheral already exists
-				if svd_periph.attrib["derivedFrom"] in periph_instances_dict:
-					periph = periph_instances_dict[svd_periph.attrib["derivedFrom"]].parent
-				else:
-					continue
-		
-			# create instance from its name, address and base peripheral
-			inst_name = svd_periph.find("name").text
-			inst_addr = int(svd_periph.find("baseAddress").text, 0)
-			inst_brief = get_node_text(svd_periph,"description")
-			instance = PeripheralInstance(periph.chips,inst_name,inst_brief,inst_addr)
+		for device, svd_periph in self.iter_peripherals() :
+			if self.chipset.empty :
+				# the device name precedes the peripherals
+				self.chipset.add(Chip(get_node_text(device, "name"), self.file_name))
 
-			# add the instance to its peripheral, and to the instances list
-			periph.add_instance(instance)
-			periph_instances_dict[inst_name] = instance
+			self.process_peripheral(svd_periph, periph_instances_dict, filter_grp_name)
 		
 		for grp_name in self.groups:
 			grp = self.groups[grp_name]
 
-			grp.edited = True
-			while grp.has_been_edited :
-				grp.validate_edit()
+			grp.invalidate()
+			while grp.edited :
+				grp.validate()
 				grp.before_svd_compile()
 
-			grp.edited = True
-			while grp.has_been_edited :
-				grp.validate_edit()
+			grp.invalidate()
+			while grp.edited :
+				grp.validate()
 				grp.svd_compile()
 
-			grp.edited = True
-			while grp.has_been_edited :
-				grp.validate_edit()
+			grp.invalidate()
+			while grp.edited :
+				grp.validate()
 				grp.after_svd_compile()
-		
-	
\ No newline at end of file
+
+	def iter_peripherals(self) -> T.Iterator[T.Tuple[ET.Element, ET.Element]] :
+		"""
+		Parse the SVD file peripheral by peripheral.
+		Each peripheral is dropped once the caller is done with it :
+		the whole SVD tree is never held in memory.
+		:return: The device node and each peripheral node
+		"""
+		if _has_lxml :
+			# comments are removed as xml.etree would do,
+			# so that they do not split the text of the nodes.
+			events = ET.iterparse(self.path, events=("end",), tag="peripheral",
+			                      huge_tree=True, remove_blank_text=True,
+			                      remove_comments=True)
+			for _, svd_periph in events :
+				yield svd_periph.getparent().getparent(), svd_periph
+				svd_periph.clear()
+				while svd_periph.getprevious() is not None :
+					del svd_periph.getparent()[0]
+		else :
+			# xml.etree elements do not know their parent : keep track of the open nodes
+			open_nodes : T.List[ET.Element] = list()
+			for event, node in ET.iterparse(self.path, events=("start", "end")) :
+				if event == "start" :
+					open_nodes.append(node)
+					continue
+				open_nodes.pop()
+				if node.tag == "peripheral" :
+					yield open_nodes[0], node
+					open_nodes[-1].remove(node)
+
+	def process_peripheral(self, svd_periph : ET.Element,
+	                       periph_instances_dict : T.Dict[str,PeripheralInstance],
+	                       filter_grp_name : T.List[str] = None):
+		#periph : Peripheral = None
+		group_name : str =  get_node_text(svd_periph, "groupName").upper()
+		if "derivedFrom" not in svd_periph.attrib:  # new peripheral
+			# return the group associated with the name, and creates it if necessary
+			if filter_grp_name is not None and len(filter_grp_name) > 0 and group_name not in filter_grp_name :
+				return
+	
+			group = Group.get_group(self.groups, group_name)
+	
+			# create the peripheral, add it to the group
+			periph = Peripheral.create_from_xml(self.chipset, svd_periph)
+			group.add_peripheral(periph)
+	
+		else:  # peripheral already exists
+			if svd_periph.attrib["derivedFrom"] in periph_instances_dict:
+				periph = periph_instances_dict[svd_periph.attrib["derivedFrom"]].parent
+			else:
+				return
+	
+		# create instance from its name, address and base peripheral
+		inst_name = svd_periph.find("name").text
+		inst_addr = int(svd_periph.find("baseAddress").text, 0)
+		inst_brief = get_node_text(svd_periph,"description")
+		instance = PeripheralInstance(periph.chips,inst_name,inst_brief,inst_addr)
+
+		# add the instance to its peripheral, and to the instances list
+		periph.add_instance(instance)
+		periph_instances_dict[inst_name] = instance
+
@@ -48,7 +48,7 @@ class ChipSet :
 
 	def __eq__(self, other):
 		if isinstance(other,ChipSet) :
-			return len(self.chips.symmetric_difference(other.chips)) == 0
+			return self.chips == other.chips
 		else :
 			raise TypeError()
 		
@@ -19,9 +19,13 @@
 
 import typing as T
 import logging
-from math import ceil
+import re
+import sys
+import weakref
 
-from ..cleaners.corrector import Corrector
+if T.TYPE_CHECKING :
+	# annotations only : the cleaners import the structure
+	from ..cleaners.corrector import Corrector
 
 from .chipset import ChipSet
 from .utils import TabManager
@@ -29,36 +33,104 @@ from .utils import DefinesHandler
 
 logger = logging.getLogger()
 
+# Matches the ASCII identifiers found in almost all SVD names.
+_ascii_identifier = re.compile(r"[A-Za-z_][A-Za-z0-9_]*").fullmatch
+
 class FixConvergenceError(Exception):
 	pass
 
 
 class Component:
+	__slots__ = ("__weakref__", "_parent_ref", "_name", "_edited",
+	             "_alias_cache", "_computed_chips_cache", "_dirty_children",
+	             "_children_by_key", "_children_by_name", "_indexed_children", "_lock",
+	             "brief", "chips", "children")
 
 	def __init__(self,
 	             chips: T.Optional[ChipSet] = None,
 	             name: T.Optional[str] = None,
 	             brief: T.Optional[str] = None,
 	             ):
-		self._parent = None 
+		self._init_state()
 		self._name = None
-		self._edited = True
-
-		self._lock = False
 		
 		# Use custom name setter for correct processing.
 		self.name = name
 		if brief is not None and brief != name :
-			self.brief = ' '.join(brief.split())
+			# Descriptions are repeated for each chip of a family.
+			self.brief = sys.intern(' '.join(brief.split()))
 		else :
 			self.brief = None
 		
 		self.chips = ChipSet(chips)
 		self.children: T.List["Component"] = None
 
+	def _init_state(self) :
+		"""
+		Initialize the parent link, the caches and the indexes of a new component.
+		"""
+		self._parent_ref: T.Optional[weakref.ref] = None
+		self._edited = True
+		self._alias_cache: T.Optional[T.Tuple[T.Optional[str], T.Optional[str], T.Optional[str]]] = None
+		self._computed_chips_cache: T.Optional[ChipSet] = None
+		# Children invalidated since the last fix pass, indexed by id().
+		self._dirty_children: T.Dict[int, "Component"] = dict()
+		# Children indexed by match key and by name, built on demand by _child_index().
+		self._children_by_key: T.Optional[T.Dict[T.Hashable, "Component"]] = None
+		self._children_by_name: T.Optional[T.Dict[str, "Component"]] = None
+		self._indexed_children: int = 0
+
+		self._lock = False
+
+	def _bare_copy(self) -> "Component" :
+		"""
+		Copy self without its parent nor its children, bypassing __init__ :
+		the name and brief of self are already normalized.
+		:return: A new component of the same type as self.
+		"""
+		result = type(self).__new__(type(self))
+		result._init_state()
+		result._name = self._name
+		result.brief = self.brief
+		result.chips = ChipSet(self.chips)
+		result.children = None
+		return result
+
 	def __eq__(self, other):
 		return self.name == other.name
 
+	@property
+	def _match_key(self) -> T.Optional[T.Hashable] :
+		"""
+		Hashable key such that equal components have equal keys.
+		None if no such key can be cheaply computed.
+		"""
+		return self.name
+
+	def __getstate__(self):
+		# Attributes are stored in the slots of each class of the hierarchy,
+		# and in __dict__ for subclasses which do not declare __slots__.
+		state = dict()
+		for cls in type(self).__mro__ :
+			for slot in cls.__dict__.get("__slots__", ()) :
+				if slot != "__weakref__" and hasattr(self, slot) :
+					state[slot] = getattr(self, slot)
+		state.update(getattr(self, "__dict__", ()))
+		# weak references cannot be pickled : store the parent itself.
+		state["_parent_ref"] = self.parent
+		state["_alias_cache"] = None
+		state["_dirty_children"] = dict()
+		state["_children_by_key"] = None
+		state["_children_by_name"] = None
+		return state
+
+	def __setstate__(self, state):
+		# components pickled before the weak parent links stored it in _parent
+		parent = state.pop("_parent_ref") if "_parent_ref" in state else state.pop("_parent", None)
+		for attr, value in state.items() :
+			setattr(self, attr, value)
+		self._parent_ref = weakref.ref(parent) if parent is not None else None
+
 ################################################################################
 #                                  ACCESSORS                                   #
 ################################################################################
@@ -71,9 +143,13 @@ class Component:
 	def name(self, new : str):
 		if self._name is None or new != self._name :
 			if new is not None :
-				if not new.isidentifier() and not new.isalnum():
+				if not _ascii_identifier(new) and not new.isidentifier() \
+				   and not new.isalnum():
 					logger.error(f"Setting non-alphanum component name {new}")
+				# Names come from a small vocabulary repeated over all chips.
+				new = sys.intern(new)
 			self._name = new
+			self._key_changed()
 			self.invalidate()
 	
 
@@ -86,7 +162,22 @@ class Component:
 
 	@property
 	def byte_size(self) -> int :
-		return ceil(self.size/8)
+		return (self.size + 7) >> 3
+
+	@property
+	def computed_chips(self) -> ChipSet :
+		"""
+		:return: Union of the chips of the component and of all its children.
+		         Cached as long as the component is not edited.
+		"""
+		if self._computed_chips_cache is not None and not self._edited :
+			return self._computed_chips_cache
+		out = ChipSet(self.chips)
+		for child in self :
+			out.add(child.computed_chips)
+		if not self._edited :
+			self._computed_chips_cache = out
+		return out
 
 ################################################################################
 #                                EDIT TRACKING                                 #
@@ -99,53 +190,74 @@ class Component:
 	def invalidate(self):
 		"""
 		Set self as edited, and all parents as edited de facto.
+		Each invalidated component is registered as dirty in its parent.
 		"""
-		assert not self._lock, f"Tried to invalidate the component {self!r} while it's locked"
-		if not self._edited :
-			self._edited = True
-			if self.parent is not None :
-				self.parent.invalidate()
+		node = self
+		while node is not None :
+			assert not node._lock, f"Tried to invalidate the component {node!r} while it's locked"
+			parent = node.parent
+			if parent is not None :
+				parent._dirty_children[id(node)] = node
+			if node._edited :
+				break
+			node._edited = True
+			node._drop_caches()
+			node = parent
+
+	def _drop_caches(self) :
+		"""
+		Clear the values cached while the component was not edited.
+		"""
+		self._computed_chips_cache = None
 
 	def invalidate_recursive(self) :
 		"""
 		Invalidate self as edited and all children, recursively.
 		De facto invalidate parents.
 		"""
-		self.invalidate()
-		for child in self :
-			child.invalidate_recursive()
+		stack: T.List["Component"] = [self]
+		while stack :
+			node = stack.pop()
+			node.invalidate()
+			stack.extend(node)
 
 	def validate(self):
 		"""
 		Validate self and all children, recursively.
+		As invalidate() propagates to all parents, a component that is not
+		edited has no edited child : clean subtrees are not visited.
+		The children recorded as dirty are forgotten.
 		"""
-		if self._edited :
-			self._edited = False
-			for child in self :
-				child.validate()
+		stack: T.List["Component"] = [self]
+		while stack :
+			node = stack.pop()
+			if node._edited :
+				node._edited = False
+				node._dirty_children.clear()
+				stack.extend(node)
 
 ################################################################################
 #                                  HIERARCHY                                   #
 ################################################################################
 
 	def __iter__(self) -> T.Iterable["Component"]:
-		if self.children is None :
-			return self # no iteration
-		else :
-			return iter(self.children)
-	
-	def __next__(self) :
-		raise StopIteration
-	
+		return iter(()) if self.children is None else iter(self.children)
+
 	def __getitem__(self, item : T.Union[str,"Component"]) -> T.Union["Component", None]:
 		if isinstance(item,str) :
-			for child in self :
-				if child.name == item :
-					return child
+			child = self._child_name_index().get(item)
+			if child is not None :
+				return child
 		elif isinstance(item, Component):
-			for child in self :
-				if child is item or child == item :
+			key = item._match_key
+			if key is not None :
+				child = self._child_index().get(key)
+				if child is not None :
 					return child
+			else :
+				for child in self :
+					if child is item or child == item :
+						return child
 		else :
 			raise TypeError(f"Invalid key type {type(item).__name__}.")
 		raise KeyError(f"Item {item!r} not found in {self!r}.")
@@ -158,20 +270,92 @@ class Component:
 			pass
 		return False
 
+	def _child_index(self) -> T.Dict[T.Hashable, "Component"] :
+		"""
+		:return: The children indexed by their match key.
+		         Rebuilt if dropped or if the children list changed size.
+		"""
+		count = 0 if self.children is None else len(self.children)
+		if self._children_by_key is None or self._indexed_children != count :
+			index: T.Dict[T.Hashable, Component] = dict()
+			names: T.Dict[str, Component] = dict()
+			for child in self :
+				key = child._match_key
+				if key is not None :
+					index.setdefault(key, child)
+				names.setdefault(child.name, child)
+			self._children_by_key = index
+			self._children_by_name = names
+			self._indexed_children = count
+		return self._children_by_key
+
+	def _child_name_index(self) -> T.Dict[str, "Component"] :
+		"""
+		:return: The children indexed by their name.
+		         Built and dropped along with the match key index.
+		"""
+		self._child_index()
+		return self._children_by_name
+
+	def _detach_child(self, child: "Component") :
+		"""
+		Remove the given child from the children list, keeping the order of the
+		other children. The child is found by identity : list.remove() would
+		call __eq__ on all preceding children, and could remove an equal one.
+		"""
+		self._dirty_children.pop(id(child), None)
+		children = self.children
+		if children is None :
+			return
+		for i, other in enumerate(children) :
+			if other is child :
+				del children[i]
+				break
+		else :
+			return
+		index = self._children_by_key
+		if index is not None :
+			if index.get(child._match_key) is child or \
+			   self._children_by_name.get(child.name) is child :
+				# An equal child may have been hidden behind this one.
+				self._drop_child_indexes()
+			else :
+				self._indexed_children -= 1
+
+	def _key_changed(self) :
+		"""
+		Drop the children indexes of all parents, as the match key of self,
+		and thus of the parents depending on it, may have changed.
+		"""
+		node = self.parent
+		while node is not None :
+			node._drop_child_indexes()
+			node = node.parent
+
+	def _drop_child_indexes(self) :
+		"""
+		Drop the indexes of the children of self.
+		Extended by components which index their children in other ways.
+		"""
+		self._children_by_key = None
+		self._children_by_name = None
+
 	@property
 	def parent(self):
-		return self._parent
+		return self._parent_ref() if self._parent_ref is not None else None
 	
 	@parent.setter
 	def parent(self, parent: T.Optional["Component"]):
 		self.set_parent(parent)
 	
 	def set_parent(self, parent: T.Optional["Component"]):
-		if parent is not self._parent :
-			if self._parent is not None :
-				self._parent.children.remove(self)
-				self._parent.invalidate()
-			self._parent = parent
+		old_parent = self.parent
+		if parent is not old_parent :
+			if old_parent is not None :
+				old_parent._detach_child(self)
+				old_parent._key_changed()
+				old_parent.invalidate()
+			self._parent_ref = weakref.ref(parent) if parent is not None else None
 			# Use invalidate after setting parent to force invalidate the new parent.
 			self.invalidate()
 			if parent is not None :
@@ -183,16 +367,48 @@ class Component:
 			if self.children is None:
 				self.children = list()
 			self.children.append(child)
+			if self._children_by_key is not None :
+				key = child._match_key
+				if key is not None :
+					self._children_by_key.setdefault(key, child)
+				self._children_by_name.setdefault(child.name, child)
+				self._indexed_children += 1
+			self._key_changed()
 			self.add_chips(child.chips)
 			child.set_parent(self)
 		else :
 			self[child].absorb(child)
 	
+	def _adopt_children(self, children: T.List["Component"]) :
+		"""
+		Add children without looking for equal ones, unlike add_child.
+		:param children: New parentless components, distinct from each other
+		                 and from the children of self.
+		"""
+		if not children :
+			return
+		self.invalidate()
+		if self.children is None :
+			self.children = list()
+		self.children.extend(children)
+		self._drop_child_indexes()
+		self._key_changed()
+		parent_ref = weakref.ref(self)
+		for child in children :
+			child._parent_ref = parent_ref
+			self.add_chips(child.chips)
+
 	def add_chips(self, chips: T.Optional[ChipSet]):
-		if chips not in self.chips:
-			self.invalidate()
-			self.chips.add(chips)
-			self.parent.add_chips(chips)
+		"""
+		Add chips to self and to its parents.
+		Stops at the first component that already has all the chips, as its
+		own parents then have them too.
+		"""
+		node = self
+		while node is not None and chips not in node.chips :
+			node.invalidate()
+			node.chips.add(chips)
+			node = node.parent
 
 	def absorb(self, other: "Component"):
 		"""
@@ -207,14 +423,43 @@ class Component:
 			self.brief = other.brief
 		
 		self.add_chips(other.chips)
-		
-		for other_child in other :
-			for self_child in self :
-				if other_child == self_child :
-					self_child.absorb(other_child)
-					break
+
+		self_children = list(self)
+		other_children = list(other)
+		if len(self_children) == len(other_children) and \
+				all(o == s for o, s in zip(other_children, self_children)) :
+			# Congruent children (usual case in fix iterations) : pair directly.
+			for self_child, other_child in zip(self_children, other_children) :
+				self_child.absorb(other_child)
+			return
+
+		index: T.Dict[T.Hashable, Component] = dict()
+		for self_child in self_children :
+			key = self_child._match_key
+			if key is not None :
+				index.setdefault(key, self_child)
+
+		# other_children is a copy : add_child removes the child from other.
+		for other_child in other_children :
+			key = other_child._match_key
+			if key is not None :
+				match = index.get(key)
+			else :
+				match = next((c for c in self if other_child == c), None)
+
+			if match is not None :
+				match.absorb(other_child)
+				# absorbing may change the key (e.g. fields added to a register)
+				new_key = match._match_key
+				if new_key != key :
+					if key is not None and index.get(key) is match :
+						del index[key]
+					if new_key is not None :
+						index.setdefault(new_key, match)
 			else :
 				self.add_child(other_child)
+				if key is not None and other_child.parent is self :
+					index.setdefault(key, other_child)
 	
 	def merge_children(self) :
 		"""
@@ -245,6 +490,8 @@ class Component:
 
 				pos_ref += 1 
 
+			self._drop_child_indexes()
+
 ################################################################################
 #                            STRING REPRESENTATIONS                            #
 ################################################################################
@@ -262,12 +509,19 @@ class Component:
 		Used as the defined pre-processor constant when needed.
 		:return: the full name of the Component. Usually "<parent alias>_<name>"
 		"""
-		if self.parent is None : return self.name
-		else :
-			parent_alias: T.Union[str, None] = self.parent.alias
-			if parent_alias is None : return self.name
-			elif self.name is None  : return parent_alias
-			else                    : return f"{parent_alias}_{self.name}"
+		# The cache is checked against the name of self and the alias of the
+		# parent : a rename or a re-parenting only outdates the moved subtree.
+		parent = self.parent
+		parent_alias: T.Union[str, None] = None if parent is None else parent.alias
+		cache = self._alias_cache
+		if cache is not None and cache[0] == self.name and cache[1] == parent_alias :
+			return cache[2]
+
+		if parent_alias is None : alias = self.name
+		elif self.name is None  : alias = parent_alias
+		else                    : alias = f"{parent_alias}_{self.name}"
+		self._alias_cache = (self.name, parent_alias, alias)
+		return alias
 
 ################################################################################
 #                                CPP GENERATION                                #
@@ -325,7 +579,7 @@ class Component:
 		for child in self.children :
 			child.finalize()
 
-	def define(self, defines: T.Dict[ChipSet, DefinesHandler]) :
+	def define(self, defines: T.DefaultDict[ChipSet, DefinesHandler]) :
 		"""
 		Insert the definition of the component in the list of all definitions
 		of the output file. All definitions that share the same condition
@@ -333,8 +587,6 @@ class Component:
 		This method is recursively applied to all children of this component.
 		"""
 		if self.needs_define :
-			if self.chips not in defines :
-				defines[self.chips] = DefinesHandler()
 			defines[self.chips].add(
 				alias = self.defined_name,
 				defined_value = self.defined_value,
@@ -344,33 +596,42 @@ class Component:
 		for child in self :
 			child.define(defines)
 
-	def declare(self, indent: TabManager = TabManager()) -> T.Optional[str] :
+	def declare(self, indent: T.Optional[TabManager] = None) -> T.Optional[str] :
 		return None
 
 ################################################################################
 #                                    FIXES                                     #
 ################################################################################
 
-	def apply_fixes(self, parent_corrector: Corrector) :
+	def apply_fixes(self, parent_corrector: "Corrector") :
 		"""
 		Extract appropriate correctors from the parent corrector,
 		and apply them to the component.
 		If the component is invalidated by one of the correctors,
 		Re-apply all correctors.
 		The correctors are recursively applied to children components.
+		After a pass which only edited children, only those children are
+		fixed again. If the name or the chips of self changed, other
+		correctors may match self : they are applied to all children.
 		"""
+		children: T.Optional[T.List[Component]] = None
 		for _ in range(0, 100) :
 			self.validate()
+			own_state = (self.name, frozenset(self.chips.chips))
 			if self in parent_corrector :
 				for corrector in parent_corrector[self] :
 					corrector(self)
-					for child in self :
+					for child in (self if children is None else children) :
 						child.apply_fixes(parent_corrector=corrector)
 			
 			self.merge_children()
 			
 			if not self.edited :
 				break
+			if (self.name, frozenset(self.chips.chips)) != own_state :
+				children = None
+			else :
+				children = [child for child in self if id(child) in self._dirty_children]
 		else :
 			raise FixConvergenceError(f"Component {self} not valid "
 									   "after 100 fix iterations")
\ No newline at end of file
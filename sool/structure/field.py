@@ -25,6 +25,7 @@ from .utils import get_node_text, TabManager
 
 
 class Field(Component) :
+	__slots__ = ("_position", "_size", "_type_size_cache", "_hash_cache")
 
 ################################################################################
 #                                 CONSTRUCTORS                                 #
@@ -47,8 +48,10 @@ class Field(Component) :
 	             position: int = 0,
 	             size: int = 1
 	             ) :
+		self._type_size_cache: T.Optional[int] = None
+		self._hash_cache: T.Optional[int] = None
 		super().__init__(chips=chips, name=name, brief=brief)
-		self.position = position
+		self._position = position
 		self._size = size
 
 ################################################################################
@@ -60,10 +63,30 @@ class Field(Component) :
 
 	def __eq__(self, other):
 		return isinstance(other, Field) and \
+		       hash(self) == hash(other) and \
 		       self.position == other.position and \
 			   self.size == other.size and \
 			   self.name == other.name
-			   
+
+	def __hash__(self):
+		if self._hash_cache is None :
+			self._hash_cache = hash(self._match_key)
+		return self._hash_cache
+
+	def __getstate__(self):
+		state = super().__getstate__()
+		# String hashes are salted per process.
+		state["_hash_cache"] = None
+		return state
+
+	def _key_changed(self) :
+		self._hash_cache = None
+		super()._key_changed()
+
+	@property
+	def _match_key(self) -> T.Tuple[str, int, int] :
+		return self.name, self.position, self.size
+
 
 	def __cmp__(self, other) -> int :
 		if isinstance(other, Field) :
@@ -85,7 +108,12 @@ class Field(Component) :
 
 
 	def __copy__(self) :
-		return Field(chips=self.chips, name=self.name, brief=self.brief, position=self.position, size=self.size)
+		result = self._bare_copy()
+		result._position = self._position
+		result._size = self._size
+		result._type_size_cache = self._type_size_cache
+		result._hash_cache = self._hash_cache
+		return result
 
 	@property
 	def children(self) :
@@ -97,6 +125,16 @@ class Field(Component) :
 			raise NotImplementedError(f"Fields cannot have children")
 	
 
+	@property
+	def position(self) -> int :
+		return self._position
+
+	@position.setter
+	def position(self, new_position: int) :
+		self._position = new_position
+		self._key_changed()
+		self.invalidate()
+
 	@property
 	def size(self) -> int :
 		return self._size
@@ -104,8 +142,13 @@ class Field(Component) :
 	@size.setter
 	def size(self, new_size: int) :
 		self._size = new_size
+		self._key_changed()
 		self.invalidate()
 
+	def invalidate(self):
+		self._type_size_cache = None
+		super().invalidate()
+
 ################################################################################
 #                                DEFINE AND USE                                #
 ################################################################################
@@ -114,15 +157,25 @@ class Field(Component) :
 	def defined_value(self) -> T.Union[str, None]:
 		return self.name
 
-	def declare(self, indent: TabManager = TabManager()) -> T.Union[None, str] :
+	def _resolved_type_size(self) -> int :
+		"""
+		:return: Size of the integer type used to declare the field, in bits
+		"""
+		if self._type_size_cache is None :
+			reg_size = self.parent.parent.size
+			self._type_size_cache = \
+				reg_size if reg_size <= 32 else \
+				32 if (self.position >> 5) == ((self.position + self.size) >> 5) else \
+				64
+		return self._type_size_cache
+
+	def declare(self, indent: T.Optional[TabManager] = None) -> T.Union[None, str] :
+		if indent is None :
+			indent = TabManager()
 		name = self.defined_name if self.needs_define else self.name
 		if name is None :
 			name = ""
-		type_size = \
-			self.parent.parent.size if self.parent.parent.size <= 32 else \
-			32 if int(self.position/32) == int((self.position+self.size)/32) else \
-			64
-		out = f"{indent}uint{type_size}_t {name:16} : {self.size};"
+		out = f"{indent}uint{self._resolved_type_size()}_t {name:16} : {self.size};"
 		if self.brief is not None :
 			out += f" /// {self.brief}"
 		return out + "\n"
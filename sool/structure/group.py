@@ -23,6 +23,8 @@ import logging
 import sqlite3 as sql
 import typing as T
 
+from collections import defaultdict
+
 from datetime import datetime
 
 from sool.cleaners.corrector import base_root_corrector, advanced_root_corrector
@@ -107,7 +109,7 @@ class Group(Component) :
 	def add_peripheral(self, peripheral):
 		self.peripherals.append(peripheral)
 		peripheral.set_parent(self)
-		self.edited = True
+		self.invalidate()
 
 	def create_parent_class(self) :
 		parent_class = Peripheral(self.chips, self.name + '_PARENT', f'{self.name} peripherals parent class')
@@ -155,7 +157,7 @@ class Group(Component) :
 
 						periph_1.intra_svd_merge(periph_2)
 						self.peripherals.pop(j)
-						self.edited = True
+						self.invalidate()
 						length -= 1
 				else :
 					if same_struct and different_names :
@@ -182,7 +184,7 @@ class Group(Component) :
 						               f" {periph_1.brief}, {periph_2.brief}")
 					periph_1.inter_svd_merge(periph_2)
 					self.peripherals.pop(j)
-					self.edited = True
+					self.invalidate()
 					length -= 1
 				else :
 					j += 1
@@ -246,7 +248,7 @@ class Group(Component) :
 		
 	def cpp_output(self):
 
-		defines: T.Dict[ChipSet, DefinesHandler] = dict()
+		defines: T.DefaultDict[ChipSet, DefinesHandler] = defaultdict(DefinesHandler)
 		out = ""
 		licence_text = ""
 		includes_text = "#include \"lib_utils/peripheral_include.h\"\n" \
@@ -271,9 +273,8 @@ class Group(Component) :
 			peripheral.define(defines)
 
 		self_chips = self.computed_chips
-
-		if self_chips not in defines :
-			defines[self_chips] = DefinesHandler()
+		# create the group handler
+		group_defines = defines[self_chips]
 
 		# add all defines to the group handler
 		for chips in defines :
@@ -286,9 +287,8 @@ class Group(Component) :
 		defines[self_chips].add_raw(defined=tmp)
 
 		# clear defines dictionary
-		tmp_define_handler = defines[self_chips]
-		defines = dict()
-		defines[self_chips] = tmp_define_handler
+		defines = defaultdict(DefinesHandler)
+		defines[self_chips] = group_defines
 
 		# get instances addresses and declarations
 		tmp = ""
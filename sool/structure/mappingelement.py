@@ -21,6 +21,7 @@ from . import Component, ChipSet, Register
 from .utils import get_node_text, fill_periph_hole, TabManager
 import typing as T
 import xml.etree.ElementTree as ET
+from operator import attrgetter
 
 
 class MappingElement(Component) :
@@ -28,6 +29,8 @@ class MappingElement(Component) :
 	Bind an address (register offset) to a register or a sub-peripheral within its peripheral.
 	Also allows to specify an array of register or sub-peripheral.
 	"""
+	__slots__ = ("_component", "address", "array_size", "array_space")
+
 	@staticmethod
 	def create_from_xml(chips: ChipSet, register: Register,
 	                    xml_data: ET.Element) -> "MappingElement" :
@@ -42,13 +45,16 @@ class MappingElement(Component) :
 				 address: int,
 				 array_size: int = 0, array_space: int = 0) :
 
-		from . import Peripheral
-		if not(isinstance(component, Register) or isinstance(component, Peripheral)) :
-			raise TypeError(f"Cannot create placement of {component} : not a register or peripheral")
+		# Peripheral imports this module : it cannot be imported at module level.
+		# Most placements are for registers, which skip the import.
+		if not isinstance(component, Register) :
+			from . import Peripheral
+			if not isinstance(component, Peripheral) :
+				raise TypeError(f"Cannot create placement of {component} : not a register or peripheral")
 
 		super().__init__(chips=chips, name=name, brief=component.brief)
 
-		self.component : T.Union[Register, Peripheral] = component
+		self._component : T.Union[Register, Peripheral] = component
 		self.address: int  = address
 		self.array_size : int = array_size
 		self.array_space : int = array_space
@@ -68,30 +74,42 @@ class MappingElement(Component) :
 		else :
 			return False
 
+	@property
+	def _match_key(self) -> T.Tuple :
+		return (self.address, self.name, self.array_size, self.array_space,
+		        self.component.size, self.component.name)
+
 	def __cmp__(self, other : "MappingElement") -> int:
 		if isinstance(other, MappingElement) :
 			return self.address - other.address
 		else :
 			raise TypeError()
 		
+	# Key function ordering elements as __lt__ does, for list.sort() and sorted().
+	sort_key = attrgetter("address", "name")
+
 	def __lt__(self, other : "MappingElement") -> bool:
 		if isinstance(other, MappingElement) :
-			if self.address != other.address :
-				return self.address < other.address
-			else :
-				return self.name < other.name
+			return (self.address, self.name) < (other.address, other.name)
 		else :
 			raise TypeError()
 
 	def __gt__(self, other : "MappingElement") -> bool:
 		if isinstance(other, MappingElement) :
-			if self.address != other.address :
-				return self.address > other.address
-			else :
-				return self.name > other.name
+			return (self.address, self.name) > (other.address, other.name)
 		else :
 			raise TypeError()
 
+	@property
+	def component(self) -> T.Union[Register, "Peripheral"] :
+		return self._component
+
+	@component.setter
+	def component(self, new_component: T.Union[Register, "Peripheral"]) :
+		self._component = new_component
+		self._key_changed()
+		self.invalidate()
+
 	@property
 	def size(self) -> int :
 		if self.array_size == 0:
@@ -136,7 +154,9 @@ class MappingElement(Component) :
 	def define_not(self) -> str:
 		return fill_periph_hole(self.byte_size, sep=";")
 
-	def declare(self, indent: TabManager = TabManager()) -> T.Union[None, str] :
+	def declare(self, indent: T.Optional[TabManager] = None) -> T.Union[None, str] :
+		if indent is None :
+			indent = TabManager()
 		out: str
 		if self.needs_define :
 			out = f"{indent}{self.defined_name};"
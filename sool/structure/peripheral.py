@@ -35,7 +35,12 @@ import sqlite3 as sql
 
 logger = logging.getLogger()
 
+_reserved_register = re.compile(r"^(RESERVED|reserved)[\d\w]?").match
+_integer_type = re.compile(r"^u?int\d+_t").match
+
 class Peripheral(Component) :
+	__slots__ = ("_size_cache", "_placement_keys_cache", "mappings", "instances",
+	             "templates", "max_size", "inheritFrom")
 
 	@classmethod
 	def create_from_xml(cls, chips: ChipSet, xml_data: ET.Element) -> "Peripheral" :
@@ -47,9 +52,10 @@ class Peripheral(Component) :
 
 		ret =  cls(chips=chips, name=None, brief=brief)
 
-		for xml_reg in xml_data.findall("registers/register") :
+		add_register = ret.add_register
+		for xml_reg in xml_data.iterfind("registers/register") :
 			new_register = Register.create_from_xml(chips, xml_reg)
-			ret.add_register(new_register)
+			add_register(new_register)
 
 			reg_placement = MappingElement.create_from_xml(chips=chips, register=new_register, xml_data= xml_reg)
 			ret.add_placement(reg_placement)
@@ -61,8 +67,11 @@ class Peripheral(Component) :
 	             brief: T.Union[str, None] = None) :
 		super().__init__(chips=chips, name=name, brief=brief)
 
+		self._size_cache: T.Optional[int] = None
+		self._placement_keys_cache: T.Optional[T.FrozenSet[T.Hashable]] = None
 		self.mappings: T.List[PeripheralMapping] = list()
 		self.instances: T.List[PeripheralInstance] = list()
+		self.templates: T.List[PeripheralTemplate] = list()
 		self.max_size = 0
 		self.inheritFrom : Peripheral = None
 
@@ -88,6 +97,11 @@ class Peripheral(Component) :
 		else :
 			raise TypeError()
 
+	@property
+	def _match_key(self) -> None :
+		# equality depends on the mappings
+		return None
+
 	def __contains__(self, item) -> bool:
 		if isinstance(item, PeripheralMapping) :
 			return item in self.mappings
@@ -109,13 +123,26 @@ class Peripheral(Component) :
 	def alias(self) -> T.Union[None, str]:
 		return self.name
 	
+	def _drop_caches(self) :
+		super()._drop_caches()
+		self._size_cache = None
+		self._placement_keys_cache = None
+
 	@property
 	def size(self):
+		"""
+		:return: Size of the largest mapping, in bits.
+		         Cached as long as the peripheral is not edited.
+		"""
+		if self._size_cache is not None and not self._edited :
+			return self._size_cache
 		max_size: int = 0
 		for m in self.mappings :
 			s = m.size
 			if s > max_size :
 				max_size = s
+		if not self._edited :
+			self._size_cache = max_size
 		return max_size
 
 	@property
@@ -129,7 +156,7 @@ class Peripheral(Component) :
 ################################################################################
 #                             REGISTERS MANAGEMENT                             #
 ################################################################################
-	add_register = super().add_child
+	add_register = Component.add_child
 	
 	def remove_register(self, reg: T.Union["Peripheral", Register]):
 		if reg.name is not None and reg.name in self :
@@ -143,7 +170,7 @@ class Peripheral(Component) :
 				raise KeyError(f"{reg} is not in {self}")
 			for m in self.mappings :
 				m.remove_elements_for(reg)
-		self.edited = True
+		self.invalidate()
 
 ################################################################################
 #                             INSTANCES MANAGEMENT                             #
@@ -165,7 +192,7 @@ class Peripheral(Component) :
 					return
 			other.set_parent(self)
 			self.instances.append(other)
-			self.edited = True
+			self.invalidate()
 		else:
 			raise TypeError(f"Expected a peripheral, an instance or a list of those. Got {type(other)}.")
 
@@ -179,25 +206,24 @@ class Peripheral(Component) :
 		:param other: The other peripheral
 		:return:
 		"""
-		self_placements = list()
-		other_placements = list()
-		
-		for m in self.mappings :
-			self_placements.extend(m.elements)
-		for m in other.mappings :
-			other_placements.extend(m.elements)
-
-		if len(self_placements) != len(other_placements) :
+		if sum(len(m.elements) for m in self.mappings) != \
+		   sum(len(m.elements) for m in other.mappings) :
 			return False
-		
-		for elt in self_placements :
-			if elt not in other_placements :
-				return False
-		for elmt in other_placements :
-			if elmt not in self_placements :
-				return False
-			
-		return True
+
+		return self._placement_keys() == other._placement_keys()
+
+	def _placement_keys(self) -> T.FrozenSet[T.Hashable] :
+		"""
+		:return: The match keys of the elements of all mappings.
+		         Cached as long as the peripheral is not edited.
+		"""
+		if self._placement_keys_cache is not None and not self._edited :
+			return self._placement_keys_cache
+		# equal elements have equal match keys
+		keys = frozenset(elmt._match_key for m in self.mappings for elmt in m.elements)
+		if not self._edited :
+			self._placement_keys_cache = keys
+		return keys
 		
 		# diff = list()
 		# if ignore_templates :
@@ -245,14 +271,18 @@ class Peripheral(Component) :
 			if element in m :
 				m[element].inter_svd_merge(element)
 				return
-			elif m.has_room_for(element) :
+		# the last mapping with room is used : placements usually arrive in
+		# address order, so it is most often the last mapping.
+		for m in reversed(self.mappings) :
+			if m.has_room_for(element) :
 				mapping = m
+				break
 		if mapping is None :
 			mapping = PeripheralMapping()
 			mapping.parent = self
 			self.mappings.append(mapping)
-			self.edited = True
 		mapping.add_element(element)
+		self.invalidate()
 
 	def remove_placements_for(self, reg: T.Union["Peripheral", Register]):
 		for m in self.mappings :
@@ -265,51 +295,37 @@ class Peripheral(Component) :
 	def svd_compile(self):
 		super().svd_compile()
 
-		m_idx = 0
-		while m_idx < len(self.mappings) :
-			m_offset = 1
-
-			while m_idx + m_offset < len(self.mappings) :
-				if self.mappings[m_idx].compatible(self.mappings[m_idx + m_offset]) :
-					self.mappings[m_idx].intra_svd_merge(self.mappings[m_idx + m_offset])
-					self.mappings.pop(m_idx + m_offset)
-					self.edited = True
-					continue
-				else :
-					m_offset += 1
-			m_idx += 1
-
-		r_idx = 0
-		while r_idx < len(self.registers) :
-			r_offset = 1
-			while r_idx + r_offset < len(self.registers) :
-				if self.registers[r_idx] == self.registers[r_idx + r_offset]:
-					self.registers[r_idx].inter_svd_merge(self.registers[r_idx + r_offset])
-					for mapping in self.mappings :
-						for elmt in mapping :
-							if elmt.component is self.registers[r_idx + r_offset] :
-								elmt.component = self.registers[r_idx]
-					self.registers.pop(r_idx + r_offset)
-					self.edited = True
-					continue
-				else :
-					r_offset += 1
-			r_idx += 1
+		# each mapping absorbs the following compatible mappings
+		mappings = self.mappings
+		nb_maps = len(mappings)
+		dropped: T.Set[int] = set()
+		for m_idx, mapping in enumerate(mappings) :
+			if m_idx in dropped :
+				continue
+			for o_idx in range(m_idx + 1, nb_maps) :
+				if o_idx not in dropped and mapping.compatible(mappings[o_idx]) :
+					mapping.intra_svd_merge(mappings[o_idx])
+					dropped.add(o_idx)
+		if len(dropped) > 0 :
+			self.mappings = [m for m_idx, m in enumerate(mappings)
+			                 if m_idx not in dropped]
+			self.invalidate()
+
+		# each register absorbs the following equal registers
+		merged_into = self._merge_equal_registers()
+		if len(merged_into) > 0 :
+			for mapping in self.mappings :
+				for elmt in mapping :
+					elmt.component = merged_into.get(id(elmt.component), elmt.component)
+			self.invalidate()
 
 	def after_svd_compile(self, parent_corrector):
 		super().after_svd_compile(parent_corrector)
 		# remove unused registers
-		i = 0
-		while i < len(self.registers) :
-			used = False
-			for m in self.mappings :
-				if m.has_elements_for(self.registers[i]) :
-					used = True
-					break
-			if used :
-				i+= 1
-			else :
-				self.registers.pop(i)
+		used = {id(elmt.component) for m in self.mappings for elmt in m}
+		if self.registers is not None :
+			self.registers[:] = [reg for reg in self.registers if id(reg) in used]
+			self._drop_child_indexes()
 
 		self.after_svd_compile_cmsis_coherency_check()
 
@@ -343,56 +359,70 @@ class Peripheral(Component) :
 		for m in other.mappings  : self.add_mapping(m)
 
 	def check_cmsis_header(self, cmsis_periph: CMSISPeripheral) :
+		# elements of all mappings, by name
+		elements: T.Dict[str, T.List[MappingElement]] = dict()
+		for m in self.mappings :
+			for elmt in m :
+				elements.setdefault(elmt.name, list()).append(elmt)
+
 		for cmsis_reg in cmsis_periph.registers :
-			if re.match("^(RESERVED|reserved)[\d\w]?",  cmsis_reg.name) :
+			if _reserved_register(cmsis_reg.name) :
 				continue
 
-			match = False
-			for m in self.mappings :
-				if cmsis_reg.name in m :
-					elmt = m[cmsis_reg.name]
-					match = True
-					if (cmsis_reg.array_size != 1) if (elmt.array_size == 0) else (cmsis_reg.array_size != elmt.array_size) :
-						logger.warning(f"Array size mismatch for {elmt} and header "
-						               f"{cmsis_periph.name}.{cmsis_reg.name}")
-					elif re.match("^u?int\d+_t", cmsis_reg.type) :
-						if not isinstance(elmt.component, Register) :
-							logger.warning(f"Header register {cmsis_reg.name} doesn't match subperipheral {elmt}")
-					else :
-						if isinstance(elmt, Register) :
-							logger.warning(f"Header sub-peripheral {cmsis_reg.name} doesn' match register {elmt}")
+			for elmt in elements.get(cmsis_reg.name, ()) :
+				if (cmsis_reg.array_size != 1) if (elmt.array_size == 0) else (cmsis_reg.array_size != elmt.array_size) :
+					logger.warning(f"Array size mismatch for {elmt} and header "
+					               f"{cmsis_periph.name}.{cmsis_reg.name}")
+				elif _integer_type(cmsis_reg.type) :
+					if not isinstance(elmt.component, Register) :
+						logger.warning(f"Header register {cmsis_reg.name} doesn't match subperipheral {elmt}")
+				else :
+					if isinstance(elmt, Register) :
+						logger.warning(f"Header sub-peripheral {cmsis_reg.name} doesn' match register {elmt}")
+
+	def _merge_equal_registers(self) -> T.Dict[int, Register] :
+		"""
+		Merge each register into the first equal register of the peripheral,
+		and remove the merged registers.
+		Equal registers have equal match keys : registers are bucketed by key.
+		Children without a match key are compared to the previous ones of the
+		same type.
+		:return: The register each merged register was merged into, by id()
+		"""
+		first_by_key: T.Dict[T.Hashable, Register] = dict()
+		unkeyed: T.List[Component] = list()
+		merged_into: T.Dict[int, Register] = dict()
+		for reg in self :
+			key = reg._match_key
+			if key is not None :
+				r1 = first_by_key.setdefault(key, reg)
+			else :
+				r1 = next((other for other in unkeyed
+				           if type(other) is type(reg) and other == reg), reg)
+				if r1 is reg :
+					unkeyed.append(reg)
+			if r1 is not reg :
+				r1.inter_svd_merge(reg)
+				merged_into[id(reg)] = r1
+
+		if len(merged_into) > 0 :
+			self.registers[:] = [reg for reg in self.registers
+			                     if id(reg) not in merged_into]
+			self._drop_child_indexes()
+		return merged_into
 
 	def finalize(self):
 		super().finalize()
-		nb_reg = len(self.registers)
-		r_i1 = 0
-		while r_i1 < nb_reg :
-			r_i2 = r_i1+1
-			while r_i2 < nb_reg :
-				if self.registers[r_i1] == self.registers[r_i2] :
-					r1 = self.registers[r_i1]
-					r2 = self.registers[r_i2]
-					r1.inter_svd_merge(r2)
-					self.registers.pop(r_i2)
-					nb_reg -= 1
-					nb_maps = len(self.mappings)
-					m_i = 0
-					while m_i < nb_maps :
-						m = self.mappings[m_i]
-						elmts = list(filter(lambda e : e.component is r2, m.elements))
-						for elmt in elmts :
-							elmt.component = r1
-							m.remove_element(elmt)
-							self.add_placement(elmt)
-						if len(m.elements) == 0 :
-							self.mappings.pop(m_i)
-							nb_maps -= 1
-						else :
-							m_i += 1
-
-				else :
-					r_i2 += 1
-			r_i1 += 1
+		merged_into = self._merge_equal_registers()
+		if len(merged_into) > 0 :
+			# new mappings created by add_placement only hold merged registers
+			for m in list(self.mappings) :
+				elmts = [e for e in m.elements if id(e.component) in merged_into]
+				for elmt in elmts :
+					elmt.component = merged_into[id(elmt.component)]
+					m.remove_element(elmt)
+					self.add_placement(elmt)
+			self.mappings = [m for m in self.mappings if len(m.elements) > 0]
 
 		for i in self.instances :
 			i.set_parent(self)
@@ -427,14 +457,18 @@ class Peripheral(Component) :
 #                          DEFINE, UNDEFINE, DECLARE                           #
 ################################################################################
 
-	def declare_templates(self, indent: TabManager = TabManager()) -> str :
+	def declare_templates(self, indent: T.Optional[TabManager] = None) -> str :
+		if indent is None :
+			indent = TabManager()
 		out = ""
 		if self.has_template :
 			for tmpl in self.templates :
 				out += tmpl.declare(indent)
 		return out
 
-	def declare(self, indent: TabManager = TabManager()) -> str :
+	def declare(self, indent: T.Optional[TabManager] = None) -> str :
+		if indent is None :
+			indent = TabManager()
 		out =""
 		if self.needs_define :
 			out += f"{indent}#ifdef {self.defined_name}\n"
@@ -494,7 +528,7 @@ class Peripheral(Component) :
 	def defined_name(self) -> str :
 		return f"PERIPH_{self.alias}"
 
-	def define(self, defines: T.Dict[ChipSet, DefinesHandler]):
+	def define(self, defines: T.DefaultDict[ChipSet, DefinesHandler]):
 		super().define(defines)
 		for mapping in self.mappings :
 			mapping.define(defines)
@@ -502,7 +536,7 @@ class Peripheral(Component) :
 		for tmpl in self.templates :
 			tmpl.define(defines)
 
-	def define_instances(self,defines: T.Dict[ChipSet, DefinesHandler]):
+	def define_instances(self,defines: T.DefaultDict[ChipSet, DefinesHandler]):
 		for instance in self.instances :
 			instance.define(defines)
 
@@ -530,7 +564,11 @@ class Peripheral(Component) :
 		reg_map = dict()
 		"""Maps a register name to its SQL ID"""
 		placement_map = dict()
-		done_map = dict()
+		# (name, register id, address) of the placements already inserted,
+		# i.e. the unicity constraint of the reg_placements table.
+		done_placements: T.Set[T.Tuple[str, int, int]] = set()
+		# name of the first placement of each register id at each address
+		first_names: T.Dict[T.Tuple[int, int], str] = dict()
 
 		for instance in self.instances:
 			instance.generate_sql(cursor, this_id)
@@ -558,25 +596,19 @@ class Peripheral(Component) :
 				else :
 					raise ValueError()
 
-				# A register placement will be considered done if its id and addr are already done.
-				key = (reg_id,elt.address,this_id)
+				# A register placement will be considered done if its name, id and addr are already done.
+				key = (elt.name,reg_id,elt.address)
+				first_name = first_names.setdefault((reg_id,elt.address), elt.name)
 
-				skip_regplacement = False
-				if key in done_map :
-					if done_map[key] == elt.name :
-						skip_regplacement = True
+				if key in done_placements :
+					if first_name != elt.name :
+						logger.error(f"Register mapping unicity failure on peripheral {self.name} : double mapping of {elt.name} onto {first_name}")
 				else :
-					done_map[key] = elt.name
-
-				if not skip_regplacement :
-					try :
-						cursor.execute("""INSERT INTO reg_placements(periph_id,register_id,name,array_size,pos) 
-											VALUES (:pid,:rid,:n,:asize,:pos)""",
-									   {"pid":this_id,"rid":reg_id,"n":elt.name,"asize":elt.array_size,"pos":elt.address})
-						placement_map[elt.name] = cursor.lastrowid
-
-					except sql.IntegrityError:
-						logger.error(f"Register mapping unicity failure on peripheral {self.name} : double mapping of {elt.name} onto {done_map[key]}")
+					done_placements.add(key)
+					cursor.execute("""INSERT INTO reg_placements(periph_id,register_id,name,array_size,pos) 
+										VALUES (:pid,:rid,:n,:asize,:pos)""",
+								   {"pid":this_id,"rid":reg_id,"n":elt.name,"asize":elt.array_size,"pos":elt.address})
+					placement_map[elt.name] = cursor.lastrowid
 
 					reg_map[reg_id] = (elt.name,elt.array_size,elt.address)
 
@@ -20,6 +20,7 @@
 
 import typing as T
 import sqlite3 as sql
+from operator import attrgetter
 
 from sool.tools import global_parameters
 
@@ -30,6 +31,11 @@ from .utils import DefinesHandler, TabManager
 class PeripheralInstance(Component) :
 	#TODO consider templates
 
+	# (source value, generated string) of the defined name and value,
+	# regenerated when the name or the address changes.
+	_defined_name_cache: T.Optional[T.Tuple[str, str]] = None
+	_defined_value_cache: T.Optional[T.Tuple[int, str]] = None
+
 	def __init__(self, chips: T.Union[ChipSet, None] = None,
 	             name: T.Union[str, None] = None,
 	             brief: T.Union[str, None] = None,
@@ -43,11 +49,14 @@ class PeripheralInstance(Component) :
 		       self.name == other.name and \
 		       self.address == other.address
 
+	@property
+	def _match_key(self) -> T.Tuple[str, int] :
+		return self.name, self.address
+
+	sort_key = attrgetter("address", "name")
+
 	def __lt__(self, other: "PeripheralInstance") :
-		if self.address != other.address :
-			return self.address < other.address
-		else :
-			return self.name < other.name
+		return (self.address, self.name) < (other.address, other.name)
 
 	@property
 	def needs_define(self) -> bool :
@@ -62,7 +71,11 @@ class PeripheralInstance(Component) :
 
 	@property
 	def defined_value(self) -> T.Union[str, None] :
-		return f"((uint32_t){self.address:#08x}U)"
+		cache = self._defined_value_cache
+		if cache is None or cache[0] != self.address :
+			cache = (self.address, f"((uint32_t){self.address:#08x}U)")
+			self._defined_value_cache = cache
+		return cache[1]
 
 	@property
 	def define_not(self) -> T.Union[bool, str] :
@@ -70,7 +83,11 @@ class PeripheralInstance(Component) :
 
 	@property
 	def defined_name(self) -> str :
-		return f"{self.name}_BASE_ADDR"
+		cache = self._defined_name_cache
+		if cache is None or cache[0] is not self.name :
+			cache = (self.name, f"{self.name}_BASE_ADDR")
+			self._defined_name_cache = cache
+		return cache[1]
 
 	@property
 	def template_reg_variants(self) -> T.List[RegisterVariant] :
@@ -84,7 +101,7 @@ class PeripheralInstance(Component) :
 	def has_template(self) -> bool :
 		return len(self.template_reg_variants) > 0
 
-	def define(self, defines: T.Dict[ChipSet, DefinesHandler]) :
+	def define(self, defines: T.DefaultDict[ChipSet, DefinesHandler]) :
 		# defines the address
 		super().define(defines)
 
@@ -103,8 +120,6 @@ class PeripheralInstance(Component) :
 			for tmpl in templates :
 				chips = self.chips if self.chips.chips.issubset(tmpl.chips.chips) \
 						else ChipSet(self.chips.chips.intersection(tmpl.chips.chips))
-				if chips not in defines :
-					defines[chips] = DefinesHandler()
 
 				if not chips.chips.issubset(remaining) :
 					raise AssertionError("multiple templates defines in parallel for a single instance")
@@ -116,10 +131,8 @@ class PeripheralInstance(Component) :
 					define_not=False,
 					undefine=True
 				)
-		if len(templates) == 0 or len(list(remaining)) > 0 :
+		if len(templates) == 0 or len(remaining) > 0 :
 			chips = self.chips if len(templates) == 0 else ChipSet(remaining)
-			if chips not in defines :
-				defines[chips] = DefinesHandler()
 
 			defines[chips].add(
 				alias=f"{self.name}_TMPL",
@@ -129,7 +142,9 @@ class PeripheralInstance(Component) :
 			)
 
 
-	def declaration_strings(self, indent : TabManager = TabManager()) -> str:
+	def declaration_strings(self, indent : T.Optional[TabManager] = None) -> str:
+		if indent is None :
+			indent = TabManager()
 		out = ""
 		class_name = self.parent.name
 		if self.parent.has_template :
@@ -139,41 +154,41 @@ class PeripheralInstance(Component) :
 				class_name += f"<>"
 		# end if has_template
 
-		normal_instance = str(indent + (
-			0 if global_parameters.physical_mapping else 1)) + \
-						  "volatile class {0} * const {1} = reinterpret_cast<class {0}* const>({2});\n" \
-							  .format(class_name, self.name, self.defined_name)
-
-		nophy_instance = (str(indent + 1) + "volatile class {0} * const {1} = new class {0}({2});\n")\
-			.format(class_name, self.name, self.defined_name)
+		name = self.name
+		defined_name = self.defined_name
+		normal_instance = f"volatile class {class_name} * const {name} = " \
+		                  f"reinterpret_cast<class {class_name}* const>({defined_name});\n"
 
 		if not global_parameters.physical_mapping :
-			out += f"{indent}#if __SOOL_DEBUG_NOPHY\n" \
-				   f"{nophy_instance}" \
-				   f"{indent}#else\n" \
-				   f"{normal_instance}" \
-				   f"{indent}#endif\n"
+			# the nophy variant is only built when it is emitted
+			outer = str(indent)
+			inner = indent + 1
+			out += f"{outer}#if __SOOL_DEBUG_NOPHY\n" \
+				   f"{inner}volatile class {class_name} * const {name} = new class {class_name}({defined_name});\n" \
+				   f"{outer}#else\n" \
+				   f"{inner}{normal_instance}" \
+				   f"{outer}#endif\n"
 		else :
-			out += normal_instance
+			out += f"{indent}{normal_instance}"
 
 		return out
 
-	def declare(self, indent: TabManager = TabManager()) -> T.Union[None,str] :
-
-		ifdef_string : str = ""
+	def declare(self, indent: T.Optional[TabManager] = None) -> T.Union[None,str] :
+		if indent is None :
+			indent = TabManager()
 
+		conditions : T.List[str] = list()
 		if self.needs_define :
-			ifdef_string += f"defined({self.defined_name}) "
+			conditions.append(f"defined({self.defined_name}) ")
 		if self.parent.needs_define :
-			if ifdef_string != "" :
-				ifdef_string += "&& "
-			ifdef_string += f"defined({super().defined_name}) "
+			conditions.append(f"defined({super().defined_name}) ")
 
-		if len(ifdef_string) > 0 :
+		if len(conditions) > 0 :
+			outer = str(indent)
 			indent.increment()
-			out = f"\n{indent -1 }#if {ifdef_string}\n" \
-				  f"{self.declaration_strings(indent)}" \
-				  f"{indent-1}#endif\n"
+			out = "".join(("\n", outer, "#if ", "&& ".join(conditions), "\n",
+			               self.declaration_strings(indent),
+			               outer, "#endif\n"))
 			indent.decrement()
 		else:
 			out = self.declaration_strings(indent)
@@ -34,6 +34,8 @@ class PeripheralMapping(Component) :
 		super().__init__(chips=chips, name=name)
 
 		self.elements: T.List[MappingElement] = list()
+		# Elements indexed by name, built on demand by _element_index().
+		self._elements_by_name: T.Optional[T.Dict[str, MappingElement]] = None
 
 ################################################################################
 #                                  OPERATORS                                   #
@@ -51,6 +53,27 @@ class PeripheralMapping(Component) :
 				return False
 		return True
 
+	@property
+	def _match_key(self) -> None :
+		return None
+
+	def _element_index(self) -> T.Dict[str, MappingElement] :
+		"""
+		:return: The elements indexed by their name.
+		         Rebuilt if dropped or if the elements list changed size.
+		"""
+		index = self._elements_by_name
+		if index is None or len(index) != len(self.elements) :
+			index = dict()
+			for elmt in self.elements :
+				index.setdefault(elmt.name, elmt)
+			self._elements_by_name = index
+		return index
+
+	def _drop_child_indexes(self) :
+		super()._drop_child_indexes()
+		self._elements_by_name = None
+
 	def __getitem__(self, item):
 		if isinstance(item,int):
 			for x in self.elements :
@@ -58,15 +81,16 @@ class PeripheralMapping(Component) :
 					return x
 			raise KeyError()
 		if isinstance(item, str) :
-			for x in self.elements :
-				if x.name == item :
-					return x
-			raise KeyError()
+			x = self._element_index().get(item)
+			if x is None :
+				raise KeyError()
+			return x
 		if isinstance(item, MappingElement):
-			for x in self.elements :
-				if x == item :
-					return x
-			raise KeyError()
+			# equal elements have the same name
+			x = self._element_index().get(item.name)
+			if x is None or x != item :
+				raise KeyError()
+			return x
 		raise TypeError()
 
 	def __contains__(self, item):
@@ -78,13 +102,10 @@ class PeripheralMapping(Component) :
 			except KeyError :
 				return False
 		elif isinstance(item, str) :
-			try :
-				a = self[item]
-				return True
-			except KeyError :
-				return False
+			return item in self._element_index()
 		elif isinstance(item, MappingElement) :
-			return item in self.elements
+			x = self._element_index().get(item.name)
+			return x is not None and x == item
 		elif isinstance(item, Register) or isinstance(item, Peripheral) :
 			for e in self.elements :
 				if e.component == item :
@@ -93,7 +114,7 @@ class PeripheralMapping(Component) :
 
 	@property
 	def size(self):
-		self.elements.sort()
+		self.elements.sort(key=MappingElement.sort_key)
 		last = self.elements[-1]
 		return last.address*8 + last.size
 
@@ -131,23 +152,26 @@ class PeripheralMapping(Component) :
 			self.add_element(elmt)
 
 	def add_element(self, element: MappingElement, intra_svd: bool = False) :
-		for elmt in self :
+		index = self._element_index()
+		elmt = index.get(element.name)
+		if elmt is not None :
 			if elmt == element :
 				if intra_svd :
 					elmt.intra_svd_merge(element)
 				else :
 					elmt.inter_svd_merge(element)
 				return
-			elif elmt.name == element.name :
+			else :
 				raise AssertionError(
 					f"Two different placements for {elmt.name}: {element.address}, {elmt.address}")
 
 		self.elements.append(element)
+		index[element.name] = element
 		element.set_parent(self)
-		self.edited = True
+		self.invalidate()
 
 	def get_elements_for(self, reg: T.Union[Register, "Peripheral"]) :
-		return filter(lambda elmt : elmt.component is reg, self.elements)
+		return (elmt for elmt in self.elements if elmt.component is reg)
 
 	def has_elements_for(self, reg : T.Union[Register, "Peripheral"]) :
 		for elmt in self.elements :
@@ -160,6 +184,7 @@ class PeripheralMapping(Component) :
 		while i < len(self.elements) :
 			if self.elements[i].component is reg :
 				self.elements.pop(i)
+				self._elements_by_name = None
 			else :
 				i+=1
 
@@ -167,6 +192,7 @@ class PeripheralMapping(Component) :
 		idx = self.elements.index(element)
 		if idx >= 0 :
 			self.elements.pop(idx)
+			self._elements_by_name = None
 	"""
 	def after_svd_compile(self, parent_corrector):
 		super().after_svd_compile(parent_corrector)
@@ -248,7 +274,9 @@ class PeripheralMapping(Component) :
 #                          DEFINE, UNDEFINE & DECLARE                          #
 ################################################################################
 
-	def declare(self, indent: TabManager = TabManager()) -> str:
+	def declare(self, indent: T.Optional[TabManager] = None) -> str:
+		if indent is None :
+			indent = TabManager()
 		out: str = ""
 		pos: int = 0
 		last_register : T.Optional[MappingElement] = None
@@ -258,7 +286,7 @@ class PeripheralMapping(Component) :
 			out += f"{indent}struct\n{indent}{{\n"
 			indent.increment()
 
-		self.elements.sort()
+		self.elements.sort(key=MappingElement.sort_key)
 		for elmt in self.elements :
 			if last_register is None or (elmt.address + elmt.byte_size) > (last_register.address + last_register.byte_size) :
 				last_register = elmt
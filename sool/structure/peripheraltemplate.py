@@ -19,7 +19,7 @@
 
 import typing as T
 from . import Component, ChipSet, RegisterVariant, PeripheralInstance,  Register
-from .utils import DefinesHandler, TabManager
+from .utils import TabManager
 
 
 class PeripheralTemplate(Component) :
@@ -69,15 +69,15 @@ class PeripheralTemplate(Component) :
 		super().finalize()
 
 	def define_for_instance(self, defines, instance, define_not: bool = False) :
-		if self.chips not in defines :
-			defines[self.chips] = DefinesHandler()
 		defines[self.chips].add(
 			alias=f"{instance.name}_tmpl",
 			defined_value=self.name,
 			define_not=define_not,
 			undefine=True)
 
-	def declare(self, indent: TabManager = TabManager()) -> T.Union[None,str] :
+	def declare(self, indent: T.Optional[TabManager] = None) -> T.Union[None,str] :
+		if indent is None :
+			indent = TabManager()
 
 		out = f"{indent}struct {self.name} /// {self.brief} \n{indent}{{\n"
 		indent.increment()
@@ -18,15 +18,18 @@
 # ******************************************************************************
 
 from enum import Enum
+from functools import lru_cache
+from os.path import commonprefix
 import re
 import typing as T
 import sqlite3 as sql
 import xml.etree.ElementTree as ET
 
 import logging
-from copy import copy
 
-from ..cleaners import Corrector
+if T.TYPE_CHECKING :
+	# annotations only : the cleaners import the structure
+	from ..cleaners import Corrector
 
 from . import Component, Field, ChipSet
 from .utils import get_node_text, TabManager
@@ -38,6 +41,10 @@ logger = logging.getLogger()
 ################################### REGISTER ###################################
 ################################################################################
 REGISTER_DEFAULT_SIZE: int = 32
+# Numbering part of register names (digits and x, y, z, n placeholders)
+_name_numbering = re.compile(r"([nxyz\d]+)")
+# Filler substitutions tried, in order, when a merged name is already taken
+_name_fillers: T.Tuple[T.Tuple[str, str], ...] = (('z', 'n'), ('y', 'z'), ('x', 'y'))
 REGISTER_DECLARATION: str = """\
 {indent}struct {reg.name}_t: public {type} /// {reg.brief}
 {indent}{{
@@ -54,19 +61,22 @@ class AccessType(Enum) :
 
 	@staticmethod
 	def from_string(str: str) :
-		if str == "read-write" :
-			return AccessType.READ_WRITE
-		if str == "read-only" :
-			return AccessType.READ_ONLY
-		if str == "write-only" :
-			return AccessType.WRITE_ONLY
+		try :
+			return _access_types[str]
+		except KeyError :
+			raise AssertionError(f"unknown access type {str}") from None
 
-		raise AssertionError(f"unknown access type {str}")
+_access_types: T.Dict[str, AccessType] = {
+	"read-write": AccessType.READ_WRITE,
+	"read-only": AccessType.READ_ONLY,
+	"write-only": AccessType.WRITE_ONLY,
+}
 
 class Register(Component) :
 
 	@staticmethod
-	def merge_names(name1: str, name2: str) -> T.Union[str, None]:
+	@lru_cache(maxsize=1024)
+	def merge_names(name_1: str, name_2: str) -> T.Union[str, None]:
 		if len(name_1) > len(name_2) :
 			tmp = name_1
 			name_1 = name_2
@@ -75,10 +85,10 @@ class Register(Component) :
 		if name_2.startswith(name_1) :
 			return name_1
 		else :
-			tokens_1 = re.split('([nxyz\d]+)', name_1)
-			tokens_2 = re.split('([nxyz\d]+)', name_2)
-			no_digit_1 = (''.join(map(lambda c : 'x' if re.match('([nxyz\d]+)', c) else c, tokens_1)))
-			no_digit_2 = (''.join(map(lambda c : 'x' if re.match('([nxyz\d]+)', c) else c, tokens_2)))
+			tokens_1 = _name_numbering.split(name_1)
+			tokens_2 = _name_numbering.split(name_2)
+			no_digit_1 = (''.join(map(lambda c : 'x' if _name_numbering.match(c) else c, tokens_1)))
+			no_digit_2 = (''.join(map(lambda c : 'x' if _name_numbering.match(c) else c, tokens_2)))
 			if no_digit_1 == no_digit_2 :
 				if tokens_1[0] + ''.join(tokens_1[2:]) == tokens_2[0] + ''.join(tokens_2[2:]) :
 					return tokens_1[0] + 'x' + ''.join(tokens_1[2:])
@@ -92,12 +102,9 @@ class Register(Component) :
 					return no_digit_1
 			else :
 
-				suffix = name_1
-				prefix = name_1
-				while len(suffix) > 0 and (suffix[0] == '_' or not name_2.endswith(suffix)) :
-					suffix = suffix[1:]
-				while len(prefix) > 0 and (prefix[-1] == '_' or not name_2.startswith(prefix)) :
-					prefix = prefix[:-1]
+				# common affixes, without the '_' next to the filler
+				suffix = commonprefix((name_1[::-1], name_2[::-1]))[::-1].lstrip('_')
+				prefix = commonprefix((name_1, name_2)).rstrip('_')
 
 				filler_length = (len(name_1) - len(prefix) - len(suffix)) if len(prefix) > 0 and len(suffix) > 0 else 0
 
@@ -140,11 +147,9 @@ class Register(Component) :
 		register = cls(chips=chips, name=name, brief=brief,
 		                    size=size, access=AccessType.from_string(access))
 
-		xml_fields = xml_data.findall("fields/field")
-		if xml_fields is not None :
-			for xml_field in xml_fields :
-				field = Field.create_from_xml(chips, xml_field)
-				register.add_field(field=field, in_xml_node=True)
+		add_field = register.add_field
+		for xml_field in xml_data.iterfind("fields/field") :
+			add_field(Field.create_from_xml(chips, xml_field))
 
 		return register
 
@@ -163,12 +168,6 @@ class Register(Component) :
 #                                  OPERATORS                                   #
 ################################################################################
 
-	def __iter__(self) -> T.Iterable[Field]:
-		"""
-		Iterate over fields that belong to the register
-		"""
-		return iter(self.fields)
-
 	def __eq__(self, other) :
 		"""
 		Perform an equality check
@@ -178,16 +177,15 @@ class Register(Component) :
 			     False otherwise.
 		"""
 		if isinstance(other, Register) :
-			for field in self :
-				if field not in other :
-					return False
-			for field in other :
-				if field not in self :
-					return False
-			return True
+			# set comparison of the indexed field keys, size checked first
+			return self._child_index().keys() == other._child_index().keys()
 		else :
 			return False
 
+	@property
+	def _match_key(self) -> T.FrozenSet[T.Hashable] :
+		return frozenset(self._child_index())
+
 	def __copy__(self) :
 		"""
 		Generate a deep-ish copy of the register.
@@ -196,8 +194,8 @@ class Register(Component) :
 		"""
 		
 		result = Register(chips=self.chips, name=self.name, brief=self.brief, size=self.size, access=self.access)
-		for field in self :
-			result.add_field(copy(field))
+		# the fields of self are already distinct from each other
+		result._adopt_children([field.__copy__() for field in self])
 		return result
 	
 	@property
@@ -207,6 +205,13 @@ class Register(Component) :
 	@size.setter
 	def size(self, new_size: int) :
 		self._size = new_size
+		# the fields of the variants resolve their type from the register size
+		stack: T.List[Component] = list(self)
+		while stack :
+			node = stack.pop()
+			if isinstance(node, Field) :
+				node._type_size_cache = None
+			stack.extend(node)
 		self.invalidate()
 
 	@property
@@ -217,7 +222,7 @@ class Register(Component) :
 #                         FIELDS & VARIANTS MANAGEMENT                         #
 ################################################################################
 
-	add_field = super().add_child
+	add_field = Component.add_child
 
 	def absorb(self, other: "Register") :
 		super().absorb(other)
@@ -228,21 +233,17 @@ class Register(Component) :
 				logger.warning(f"\tCan't decide name when merging {self.name} with {other.name}. Keeping {self.name}.")
 				new_name = self.name
 			
-			while self.name != new_name and other.name != new_name and new_name in self.parent : # name already taken
-				#TODO comment this shit
+			# name already taken (looked up in the name index of the parent) :
+			# move the filler along x -> y -> z -> n until the name is free
+			while self.name != new_name and other.name != new_name and new_name in self.parent :
 				assert "n" not in new_name, "Replacement name already taken"
 				
-				if 'z' in new_name :
-					new_name = new_name.replace('z', 'n')
-				elif 'y' in new_name :
-					new_name = new_name.replace('y', 'z')
-				elif 'x' in new_name :
-					new_name = new_name.replace('x', 'y')
-				else :
-					assert False, "Cannot automatically rename already taken register name"
+				filler = next((f for f in _name_fillers if f[0] in new_name), None)
+				assert filler is not None, "Cannot automatically rename already taken register name"
+				new_name = new_name.replace(*filler)
 			self.name = new_name
 	
-	def apply_fixes(self, parent_corrector: Corrector) :
+	def apply_fixes(self, parent_corrector: "Corrector") :
 		old_name = self.name
 		super().apply_fixes(parent_corrector)
 		# change the name of the mappings if they shared the name of the register
@@ -103,6 +103,10 @@ class RegisterVariant(Component) :
 
 		return True
 
+	@property
+	def _match_key(self) -> None :
+		return None
+
 	def __copy__(self) :
 		result = RegisterVariant(chips=self.chips)
 		for field in self :
@@ -140,13 +144,13 @@ class RegisterVariant(Component) :
 				periph = periph.parent
 			if sorted(self.linked_instances) == sorted(periph.instances) :
 				self.linked_instances = None
-				self.edited = True
+				self.invalidate()
 
 	def force_remove_template(self):
 		if not self._force_no_instances :
 			self._force_no_instances = True
 		if self.linked_instances is not None :
-			self.edited = True
+			self.invalidate()
 			self.linked_instances = None
 
 	def has_room_for(self, field: Field) :
@@ -235,7 +239,9 @@ class RegisterVariant(Component) :
 #                                DEFINE AND USE                                #
 ################################################################################
 
-	def declare(self, indent: TabManager = TabManager()) -> T.Union[None,str] :
+	def declare(self, indent: T.Optional[TabManager] = None) -> T.Union[None,str] :
+		if indent is None :
+			indent = TabManager()
 		self.sort_fields(reverse=global_parameters.big_endian)
 		if len(self.parent.variants) == 1 :
 			out = "".join([f.declare(indent) for f in self])
@@ -25,13 +25,19 @@ import os
 import logging
 logger = logging.getLogger()
 
+# Checkpoints hold whole component trees : use large file buffers.
+DUMP_BUFFER_SIZE = 1 << 20
+# Header of the checkpoint files. To be changed when the pickled components
+# change : checkpoints of older formats cannot be restored.
+CHECKPOINT_FORMAT = b"SooL checkpoint 2\n"
+
 class Checkpoints:
 
 	@staticmethod
 	def load(root_path = ".data" ) -> "Checkpoints":
 		path = f"{root_path}/SooL.chkpt.dat"
 		if os.path.exists(path) :
-			with open(path,"rb") as f :
+			with open(path,"rb", buffering=DUMP_BUFFER_SIZE) as f :
 				return pickle.load(f)
 		else :
 			return None
@@ -40,12 +46,22 @@ class Checkpoints:
 		self.chkpt_levels : T.Dict[str,int] = dict()
 		self.chkpt_passed: T.Dict[str, bool] = dict()
 		self.chkpt_dumped: T.Dict[str,bool] = dict()
+		self._level_to_name : T.Dict[int,str] = dict()
+		self._max_level : int = -1
 
 		"""Last passed checkpoint"""
 		self.current_checkpoint : str = None
 
 		self.root_path = ".data"
 
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		# checkpoints saved before the level index was introduced
+		if "_level_to_name" not in state :
+			self._level_to_name = {level: name for name, level in self.chkpt_levels.items()}
+		if "_max_level" not in state :
+			self._max_level = max(self.chkpt_levels.values(), default=-1)
+
 	def add_chkpt(self,name: str,level : int = None):
 		"""
 		Register a new checkpoint with a given name and an optional level.
@@ -55,12 +71,14 @@ class Checkpoints:
 		"""
 		if name in self.chkpt_levels :
 			raise KeyError("Checkpoint already defined")
-		ckpt_level = 0 if len(self.chkpt_levels) == 0 else max(self.chkpt_levels.values()) +1
+		ckpt_level = self._max_level + 1
 		if level is not None :
 			ckpt_level = level
-		if ckpt_level in self.chkpt_levels.values() :
+		if ckpt_level in self._level_to_name :
 			raise ValueError("Level already defined")
 		self.chkpt_levels[name] = ckpt_level
+		self._level_to_name[ckpt_level] = name
+		self._max_level = max(self._max_level, ckpt_level)
 		self.chkpt_passed[name] = False
 
 	def __setitem__(self, key : str, value: bool):
@@ -72,10 +90,7 @@ class Checkpoints:
 		if isinstance(item, str) :
 			return self.chkpt_passed[item]
 		elif isinstance(item,int) :
-			for c in self.chkpt_levels :
-				if self.chkpt_levels[c] == item :
-					return c
-			raise KeyError
+			return self._level_to_name[item]
 		raise TypeError
 
 	def pass_checkpoint(self,chkpt : str ):
@@ -84,9 +99,8 @@ class Checkpoints:
 
 	def get_last_dumped_checkpoint(self,ref : str = None) -> str:
 		passed_checkpoints = [x for x in self.chkpt_dumped if self.chkpt_dumped[x]]
-		ref_level = max(self.chkpt_levels.values()) if ref is None else self.chkpt_levels[ref]
-		passed_chkpt_level = sorted([self.chkpt_levels[x] for x in passed_checkpoints if self.chkpt_levels[x] <= ref_level])
-		return  self[max(passed_chkpt_level)]
+		ref_level = self._max_level if ref is None else self.chkpt_levels[ref]
+		return self[max(self.chkpt_levels[x] for x in passed_checkpoints if self.chkpt_levels[x] <= ref_level)]
 
 	def level(self,chkpt : str):
 		"""
@@ -102,31 +116,39 @@ class Checkpoints:
 
 	def perform_checkpoint(self,chkpt,obj : object):
 		logger.info(f"Checkpointing step {chkpt} in {os.path.abspath(self.filepath(chkpt))}...")
-		with open(self.filepath(chkpt), "wb") as dump_file:
-			pickle.dump(obj, dump_file)
+		with open(self.filepath(chkpt), "wb", buffering=DUMP_BUFFER_SIZE) as dump_file:
+			dump_file.write(CHECKPOINT_FORMAT)
+			pickle.dump(obj, dump_file, protocol=pickle.HIGHEST_PROTOCOL)
 		self.chkpt_dumped[chkpt] = True
 
 	def save(self, path : str = None):
 		if path is None :
 			path = f"{self.root_path}/SooL.chkpt.dat"
-		with open(path, "wb") as dump_file:
-			pickle.dump(self, dump_file)
+		with open(path, "wb", buffering=DUMP_BUFFER_SIZE) as dump_file:
+			pickle.dump(self, dump_file, protocol=pickle.HIGHEST_PROTOCOL)
 
 	def restore(self, chkpt : str = None):
 		logger.info(f"Attempting restoration from {chkpt}.")
 		chkpt = self.get_last_dumped_checkpoint(chkpt)
-		while not os.path.exists(self.filepath(chkpt)) and self.level(chkpt) > 0:
+		level = self.level(chkpt)
+		path = self.filepath(chkpt)
+		while not os.path.exists(path) and level > 0:
 
 			self.chkpt_dumped[chkpt] = False
-			chkpt = self[self.level(chkpt) - 1]
+			level -= 1
+			chkpt = self[level]
+			path = self.filepath(chkpt)
 			logger.warning(f"Checkpoint not found, trying previous available : {chkpt}.")
 
-		if not 	os.path.exists(self.filepath(chkpt)) :
+		if not 	os.path.exists(path) :
 			logger.error("No valid checkpoint found. Restarting from scratch !")
 			return None
 
 		else:
-			with open(self.filepath(chkpt),"rb") as pkl_f :
+			with open(path,"rb", buffering=DUMP_BUFFER_SIZE) as pkl_f :
+				if pkl_f.read(len(CHECKPOINT_FORMAT)) != CHECKPOINT_FORMAT :
+					logger.error(f"Checkpoint {chkpt} has an outdated format. Restarting from scratch !")
+					return None
 				logger.info(f"Loading checkpoint {chkpt}...")
 				return pickle.load(pkl_f)
 
@@ -19,13 +19,31 @@
 
 import typing as T
 import logging
-import xml.etree.ElementTree as ET
+try :
+	from lxml import etree as ET
+except ImportError :
+	import xml.etree.ElementTree as ET
 import fnmatch
 import os
+import re
 
 logger = logging.getLogger()
 
 
+def _compile_patterns(patterns : T.Iterable[str]) -> T.Optional[T.Pattern]:
+	"""
+	Compile a list of shell-style patterns into a single regex matching any of them.
+	Names must be passed through os.path.normcase, as fnmatch.fnmatch does.
+	:param patterns: fnmatch patterns
+	:return: the compiled union, or None if there is no pattern
+	"""
+	patterns = list(patterns)
+	if not patterns :
+		return None
+	return re.compile("|".join(f"(?:{fnmatch.translate(os.path.normcase(p))})" for p in patterns))
+
+
+
 class ParametersHandler :
 	generate_options = {"no-phy" 	: "Generate to allow targetting a non-physical device (emulation).",
 						"big-endian": "Swich to big endian memory organization.",
@@ -89,6 +107,9 @@ class ParametersHandler :
 		self.refresh_output     : bool = False
 
 		self.group_filter		: T.List[str] = list()
+		self._chips_keep_re		: T.Optional[T.Pattern] = None
+		self._chips_exclude_re	: T.Optional[T.Pattern] = None
+		self._chip_valid_cache	: T.Dict[str,bool] = dict()
 		self.chips_filter		: T.List[str] = list()
 		self.chips_exclude		: T.List[str] = list()
 
@@ -180,23 +201,43 @@ class ParametersHandler :
 	def got_chip_exclude(self):
 		return len(self.chips_exclude) > 0
 
+	@property
+	def chips_filter(self) -> T.List[str]:
+		return self._chips_filter
+
+	@chips_filter.setter
+	def chips_filter(self, patterns : T.List[str]):
+		self._chips_filter = patterns
+		self._chips_keep_re = _compile_patterns(patterns)
+		self._chip_valid_cache.clear()
+
+	@property
+	def chips_exclude(self) -> T.List[str]:
+		return self._chips_exclude
+
+	@chips_exclude.setter
+	def chips_exclude(self, patterns : T.List[str]):
+		self._chips_exclude = patterns
+		self._chips_exclude_re = _compile_patterns(patterns)
+		self._chip_valid_cache.clear()
+
 	def __chip_keep(self,chip_name : str) -> bool:
-		if not self.got_chip_filter :
+		if self._chips_keep_re is None :
 			return True
-		for p in self.chips_filter :
-			if fnmatch.fnmatch(chip_name,p) :
-				return True
+		return self._chips_keep_re.match(os.path.normcase(chip_name)) is not None
 
 	def __chip_exclude(self, chip_name: str) -> bool:
-		if not self.got_chip_exclude:
+		if self._chips_exclude_re is None:
 			return False
-		for p in self.chips_exclude:
-			if fnmatch.fnmatch(chip_name, p):
-				return True
-		return False
+		return self._chips_exclude_re.match(os.path.normcase(chip_name)) is not None
 
 	def is_chip_valid(self, chip_name : str):
-		return self.__chip_keep(chip_name) and not self.__chip_exclude(chip_name)
+		try :
+			return self._chip_valid_cache[chip_name]
+		except KeyError :
+			valid = self.__chip_keep(chip_name) and not self.__chip_exclude(chip_name)
+			self._chip_valid_cache[chip_name] = valid
+			return valid
 
 	def process_generate(self,options : T.List[str]):
 
@@ -283,9 +324,11 @@ class ParametersHandler :
 		upgrade_list = args.upgrade_svd
 		self.process_updates(update_list,upgrade_list)
 
-		for exclude in self.chips_exclude :
-			self.family_upgrade_request = [f for f in self.family_upgrade_request if not fnmatch.fnmatch(f, exclude)]
-			self.family_update_request =  [f for f in self.family_update_request  if not fnmatch.fnmatch(f, exclude)]
+		# the exclude patterns were compiled into a single regex by their setter
+		if self._chips_exclude_re is not None :
+			excluded = self._chips_exclude_re.match
+			self.family_upgrade_request = [f for f in self.family_upgrade_request if not excluded(os.path.normcase(f))]
+			self.family_update_request =  [f for f in self.family_update_request  if not excluded(os.path.normcase(f))]
 
 
 
@@ -17,8 +17,11 @@
 #   along with SooL core Library. If not, see  <https://www.gnu.org/licenses/>.*
 # ******************************************************************************
 
-import xml.etree.ElementTree as ET
-import xml.dom.minidom as minidom
+try :
+    from lxml import etree as ET
+except ImportError :
+    # parameters.py falls back the same way : its elements are appended to the manifest
+    import xml.etree.ElementTree as ET
 import datetime
 import os
 import sys
@@ -39,6 +42,9 @@ class SoolManifest:
         self.generated_groups : T.List[str] = list()
         self.chip_association : T.List[Chip] = list()
         """Association chipname -> SVD,cmsis header"""
+        # Membership of the lists above, for deduplication
+        self._groups_set : T.Set[str] = set()
+        self._chips_set : T.Set[Chip] = set()
         self.generation_date : str = datetime.datetime.now().isoformat(timespec='seconds')
 
         self.root : ET.Element = ET.Element("manifest")
@@ -57,7 +63,8 @@ class SoolManifest:
         self.pdsc_version[family] = version
 
     def add_generated_group(self,group : str):
-        if group not in self.generated_groups:
+        if group not in self._groups_set:
+            self._groups_set.add(group)
             self.generated_groups.append(group)
 
     def add_chip(self,chip : T.Union[Chip,ChipSet]):
@@ -65,7 +72,8 @@ class SoolManifest:
             for c in chip :
                 self.add_chip(c)
         else:
-            if chip not in self.chip_association :
+            if chip not in self._chips_set :
+                self._chips_set.add(chip)
                 self.chip_association.append(chip)
 
     def write_generation_info(self):
@@ -75,46 +83,48 @@ class SoolManifest:
         gen_info.append(ET.Element("command-line",{"args":" ".join(sys.argv[1:])}))
         gen_info.append(global_parameters.to_xml)
 
+    def _append_digest(self, tag : str, data : T.Iterable[str]):
+        """
+        Hash the identifying data of a section, in order, and append its digest to the hash node.
+        """
+        digest = hashlib.sha1("".join(data).encode("us-ascii"), usedforsecurity=False).hexdigest()
+        ET.SubElement(self.hash, tag, {"short": digest[:6], "value": digest})
+
     def write_pdsc_infos(self):
-        hasher = hashlib.sha1()
         pdsc_root : ET.Element = ET.SubElement(self.root,"fileset")
+        versions = sorted(self.pdsc_version.items())
 
-        for k in sorted(self.pdsc_version.keys()) :
-            pdsc_root.append(ET.Element("family",{"name":k,"version":self.pdsc_version[k]}))
-            hasher.update(bytes(f"{k}={self.pdsc_version[k]}","us-ascii"))
+        pdsc_root.extend([ET.Element("family",{"name":k,"version":v}) for k, v in versions])
 
-        digest = hasher.hexdigest()
-        self.hash.append(ET.Element("files",{"short":digest[:6],"value": digest}))
+        self._append_digest("files", [f"{k}={v}" for k, v in versions])
 
     def write_groups_info(self):
-        hasher = hashlib.sha1()
         groups_root : ET.Element = ET.SubElement(self.root,"groups")
-        for group in sorted(self.generated_groups) :
-            groups_root.append(ET.Element("group", {"name": group}))
-            hasher.update(bytes(group,"us-ascii"))
+        groups = sorted(self.generated_groups)
 
-        digest = hasher.hexdigest()
+        groups_root.extend([ET.Element("group", {"name": group}) for group in groups])
 
-        self.hash.append(ET.Element("group",{"short": digest[:6], "value": digest}))
+        self._append_digest("group", groups)
 
     def write_chips_info(self):
-        hasher = hashlib.sha1()
         chips_root: ET.Element = ET.SubElement(self.root, "chips")
 
-        families : T.Dict[str,ET.Element] = dict()
+        families : T.Dict[str,T.List[ET.Element]] = dict()
+        data : T.List[str] = list()
+        basename = os.path.basename
 
         for chip in sorted(self.chip_association,key=lambda x : x.name) :
-            family = chip.family
-            if family not in families :
-                families[family] = ET.SubElement(chips_root,"family",{"name":family})
-            elt = ET.Element("chip", {"define": chip.define,
-                                      "header":os.path.basename(chip.header),
-                                      "svd" : os.path.basename(chip.svd)})
-            families[family].append(elt)
-            hasher.update(bytes(str(ET.tostring(elt)),"us-ascii"))
-
-        digest = hasher.hexdigest()
-        self.hash.append(ET.Element("chips",{"short": digest[:6], "value": digest}))
+            header = basename(chip.header)
+            svd = basename(chip.svd)
+            families.setdefault(chip.family, list()).append(
+                ET.Element("chip", {"define": chip.define, "header": header, "svd" : svd}))
+            data.append(f"{chip.define}|{header}|{svd}\n")
+
+        # families in order of their first chip
+        for family, elements in families.items() :
+            ET.SubElement(chips_root,"family",{"name":family}).extend(elements)
+
+        self._append_digest("chips", data)
 
     def construct_xml(self):
         self.write_pdsc_infos()
@@ -122,10 +132,10 @@ class SoolManifest:
         self.write_chips_info()
 
     def write_file(self):
+        # Same layout as minidom's toprettyxml, without re-parsing the tree.
+        ET.indent(self.root, space="\t")
         with open(self.file_path,"w") as out :
-            dom = minidom.parseString(ET.tostring(self.root))
-            pi = dom.createProcessingInstruction('xml-stylesheet','type="text/xsl" href="manifest.xsl"')
-            root = dom.firstChild
-            dom.insertBefore(pi, root)
-
-            out.write(dom.toprettyxml())
\ No newline at end of file
+            out.write('<?xml version="1.0" ?>\n')
+            out.write('<?xml-stylesheet type="text/xsl" href="manifest.xsl"?>\n')
+            out.write(ET.tostring(self.root, encoding="unicode"))
+            out.write("\n")
\ No newline at end of file
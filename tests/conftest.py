@@ -0,0 +1,32 @@
+import typing as T
+
+import pytest
+
+from sool.structure import Field, Peripheral, Register
+
+
+@pytest.fixture
+def make_register() -> T.Callable[..., Register] :
+	def make(name: str, size: int = 32) -> Register :
+		# registers without fields are merged together
+		register = Register(name=name, size=size)
+		register.add_field(Field(name=name, size=8))
+		return register
+	return make
+
+
+@pytest.fixture
+def make_peripheral(make_register) -> T.Callable[..., Peripheral] :
+	def make(placements: T.Iterable[T.Tuple[str, int]]) -> Peripheral :
+		"""
+		:param placements: name and address of each register to place
+		:return: A validated peripheral
+		"""
+		peripheral = Peripheral(name="TIM")
+		for name, address in placements :
+			register = make_register(name)
+			peripheral.add_register(register)
+			peripheral.place_component(register, address)
+		peripheral.validate()
+		return peripheral
+	return make
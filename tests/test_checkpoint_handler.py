@@ -0,0 +1,44 @@
+import pickle
+
+from sool.structure import Component
+from sool.tools.checkpoint_handler import Checkpoints
+
+
+def make_checkpoints(tmp_path) -> Checkpoints :
+	checkpoints = Checkpoints()
+	checkpoints.root_path = str(tmp_path)
+	checkpoints.add_chkpt("parsed")
+	checkpoints.pass_checkpoint("parsed")
+	return checkpoints
+
+
+def test_restore_checkpoint(tmp_path) :
+	checkpoints = make_checkpoints(tmp_path)
+	parent = Component(name="PARENT")
+	parent.add_child(Component(name="CHILD"))
+	checkpoints.perform_checkpoint("parsed", parent)
+
+	restored = checkpoints.restore("parsed")
+	assert restored.name == "PARENT"
+	assert restored["CHILD"].parent is restored
+
+
+def test_outdated_checkpoint_is_not_restored(tmp_path) :
+	checkpoints = make_checkpoints(tmp_path)
+	with open(checkpoints.filepath("parsed"), "wb") as dump_file :
+		pickle.dump(Component(name="PARENT"), dump_file)
+	checkpoints.chkpt_dumped["parsed"] = True
+
+	assert checkpoints.restore("parsed") is None
+
+
+def test_unpickle_component_without_weak_parent() :
+	parent = Component(name="PARENT")
+	child = Component()
+	state = child.__getstate__()
+	del state["_parent_ref"]
+	state["_parent"] = parent
+
+	restored = Component.__new__(Component)
+	restored.__setstate__(state)
+	assert restored.parent is parent
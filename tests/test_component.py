@@ -0,0 +1,78 @@
+import weakref
+
+from sool.structure import ChipSet, Component, MappingElement, PeripheralMapping, Register
+from sool.cleaners import Corrector
+
+
+def test_fixes_reach_all_children_after_rename() :
+	fixed = list()
+
+	def rename(component) :
+		component.name = "NEW"
+
+	def record(component) :
+		fixed.append(component.name)
+
+	parent = Component(name="OLD")
+	parent.add_child(Component(name="A"))
+	parent.add_child(Component(name="B"))
+
+	root_corrector = Corrector({
+		"OLD": rename,
+		"NEW": {"*": record},
+	})
+	parent.apply_fixes(root_corrector)
+
+	assert parent.name == "NEW"
+	assert sorted(fixed) == ["A", "B"]
+
+
+def test_dirty_children_are_released() :
+	parent = Component(name="PARENT")
+	child = Component(name="CHILD")
+	parent.add_child(child)
+	parent.validate()
+
+	child.invalidate()
+	assert id(child) in parent._dirty_children
+	child.parent = None
+	assert id(child) not in parent._dirty_children
+	released = weakref.ref(child)
+	del child
+	assert released() is None
+
+	other = Component(name="OTHER")
+	parent.add_child(other)
+	parent.validate()
+	assert len(parent._dirty_children) == 0
+
+
+
+def test_reparent_from_childless_parent() :
+	# mappings hold their elements outside of the children list
+	old_mapping = PeripheralMapping()
+	element = MappingElement(ChipSet(), "CR", Register(name="CR"), 0)
+	old_mapping.add_element(element)
+	assert old_mapping.children is None
+
+	new_mapping = PeripheralMapping()
+	element.parent = new_mapping
+	assert element.parent is new_mapping
+
+
+def test_alias_follows_rename_and_reparent() :
+	root = Component(name="GPIO")
+	other = Component(name="RCC")
+	child = Component(name="ODR")
+	leaf = Component(name="OD0")
+	root.add_child(child)
+	child.add_child(leaf)
+	assert leaf.alias == "GPIO_ODR_OD0"
+	assert other.alias == "RCC"
+
+	root.name = "GPIOA"
+	assert leaf.alias == "GPIOA_ODR_OD0"
+
+	child.parent = other
+	assert leaf.alias == "RCC_ODR_OD0"
+	assert root.alias == "GPIOA"
@@ -0,0 +1,56 @@
+def test_size_follows_register_size(make_peripheral) :
+	peripheral = make_peripheral([("CR", 0), ("SR", 4)])
+	assert peripheral.size == 64
+
+	peripheral["SR"].size = 64
+	peripheral.validate()
+	assert peripheral.size == 96
+
+
+def test_size_follows_new_placement(make_peripheral, make_register) :
+	peripheral = make_peripheral([("CR", 0), ("SR", 4)])
+	assert peripheral.size == 64
+
+	register = make_register("CNT")
+	peripheral.add_register(register)
+	peripheral.place_component(register, 8)
+	peripheral.validate()
+	assert peripheral.size == 96
+
+
+def test_mapping_equivalence_follows_new_placement(make_peripheral, make_register) :
+	peripheral = make_peripheral([("CR", 0), ("SR", 4)])
+	other = make_peripheral([("CR", 0), ("SR", 4)])
+	assert peripheral.mapping_equivalent_to(other)
+
+	for periph, address in ((peripheral, 8), (other, 12)) :
+		register = make_register("CNT")
+		periph.add_register(register)
+		periph.place_component(register, address)
+		periph.validate()
+	assert not peripheral.mapping_equivalent_to(other)
+
+
+def test_register_merge_keeps_distinct_mappings(make_peripheral) :
+	# overlapping registers are placed in two mappings
+	peripheral = make_peripheral([("CR", 0), ("SR", 0)])
+	assert len(peripheral.mappings) == 2
+	children = list(peripheral)
+
+	assert peripheral._merge_equal_registers() == dict()
+	assert list(peripheral) == children
+	assert sorted(elmt.name for m in peripheral.mappings for elmt in m) == ["CR", "SR"]
+
+
+def test_mapping_equivalence_follows_element_component(make_peripheral, make_register) :
+	peripheral = make_peripheral([("CR", 0), ("SR", 4)])
+	other = make_peripheral([("CR", 0), ("SR", 4)])
+	register = make_register("CNT", size=16)
+	peripheral.add_register(register)
+	peripheral.validate()
+	assert peripheral.mapping_equivalent_to(other)
+
+	element = next(elmt for m in peripheral.mappings for elmt in m if elmt.name == "SR")
+	element.component = register
+	peripheral.validate()
+	assert not peripheral.mapping_equivalent_to(other)
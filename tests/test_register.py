@@ -0,0 +1,58 @@
+import xml.etree.ElementTree as ET
+
+from sool.structure import ChipSet, Field, Peripheral, Register
+from sool.structure.registervariant import RegisterVariant
+
+REGISTER_SVD = """
+<register>
+	<name>CR</name>
+	<displayName>CR</displayName>
+	<description>control register</description>
+	<size>0x20</size>
+	<access>read-write</access>
+	<fields>
+		<field>
+			<name>EN</name>
+			<description>enable</description>
+			<bitOffset>0</bitOffset>
+			<bitWidth>1</bitWidth>
+		</field>
+		<field>
+			<name>MODE</name>
+			<description>mode</description>
+			<bitOffset>4</bitOffset>
+			<bitWidth>2</bitWidth>
+		</field>
+	</fields>
+</register>
+"""
+
+
+def test_register_from_xml_with_fields() :
+	register = Register.create_from_xml(ChipSet(), ET.fromstring(REGISTER_SVD))
+
+	assert register.size == 32
+	assert [field.name for field in register] == ["EN", "MODE"]
+	assert [(field.position, field.size) for field in register] == [(0, 1), (4, 2)]
+
+
+def test_add_fieldless_register() :
+	peripheral = Peripheral(name="TIM")
+	register = Register(name="CNT")
+	assert list(register) == []
+
+	peripheral.add_register(register)
+	peripheral.validate()
+	assert peripheral["CNT"] is register
+
+
+def test_field_type_follows_register_size() :
+	register = Register(name="CR", size=32)
+	variant = RegisterVariant()
+	variant.parent = register
+	field = Field(name="EN", position=30, size=4)
+	variant.add_field(field)
+	assert field._resolved_type_size() == 32
+
+	register.size = 64
+	assert field._resolved_type_size() == 64